@@ -4,39 +4,408 @@ Llama Crypto Query Script
 Dieses Skript ruft aktuelle Kryptokurse aus Supabase ab und übergibt sie
 als Kontext an einen lokalen Llama-LLM-Server, um Benutzerfragen zu beantworten.
 """
+from __future__ import annotations
+
 import os
-import argparse
-import requests
-from supabase import create_client, Client
+import sys
+import asyncio
+import contextlib
+import functools
+import hashlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable
+
+import orjson
+
+# httpx, redis und das Supabase-SDK werden erst bei Bedarf importiert, damit
+# --help und Cache-Treffer nicht deren Ladezeit bezahlen
+if TYPE_CHECKING:
+    import argparse
+    import httpx
+    import redis.asyncio as redis
+    from realtime import AsyncRealtimeChannel
+    from supabase._async.client import AsyncClient
 
 # Supabase-Konfiguration aus Umgebungsvariablen
+# SUPABASE_URL ist die REST-URL des Projekts (https://<ref>.supabase.co). Das
+# Skript spricht nur mit PostgREST, das selbst einen Postgres-Verbindungspool
+# verwaltet; der Transaction-Pooler (Port 6543) ist nur für direkte
+# Postgres-Verbindungen nötig.
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# Anfragen an den Llama-Server werden mit orjson serialisiert
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Verbindungspool zu Supabase: 3 dauerhafte Verbindungen plus 2 Reserve,
+# unbenutzte Verbindungen werden nach 30 Minuten geschlossen
+SUPABASE_HTTP_LIMITS = {"max_connections": 5, "max_keepalive_connections": 3, "keepalive_expiry": 1800}
+
 # Llama-Server-Konfiguration (lokal)
 LLAMA_API_URL = os.getenv("LLAMA_API_URL", "http://localhost:11434/api/generate")
 LLAMA_MODEL = os.getenv("LLAMA_MODEL", "llama2")
+# Maximale Anzahl gleichzeitiger Anfragen; sollte OLLAMA_NUM_PARALLEL des Servers entsprechen
+LLAMA_CONCURRENCY = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+# Redis-Cache für LLM-Antworten
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_TIMEOUT = 0.5
+LLAMA_CACHE_TTL = int(os.getenv("LLAMA_CACHE_TTL", "300"))
+CRYPTO_CACHE_KEY = "crypto_prices:latest"
+CRYPTO_CACHE_TTL = int(os.getenv("CRYPTO_CACHE_TTL", "20"))
+
+# Supabase-Client wird einmal pro Prozess erzeugt und wiederverwendet
+_supabase: AsyncClient | None = None
+_supabase_lock = asyncio.Lock()
+
+# Jüngster Kurs je Symbol, per Realtime-Subscription laufend aktualisiert
+LATEST_PRICES: dict[str, dict] = {}
+_realtime_channel: AsyncRealtimeChannel | None = None
+REALTIME_SUBSCRIBE_TIMEOUT = 10
+# Referenzen auf Hintergrund-Tasks, damit sie nicht vorzeitig eingesammelt werden
+_background_tasks: set = set()
 
 
-def get_crypto_data() -> list:
+async def get_supabase_client() -> AsyncClient:
     """
-    Ruft aktuelle Kryptokurse aus der Supabase-Datenbank ab.
+    Liefert den gemeinsam genutzten asynchronen Supabase-Client.
     
     Returns:
-        Liste von Krypto-Datensätzen
+        Initialisierter AsyncClient
     """
+    global _supabase
+    
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
         raise ValueError("SUPABASE_URL und SUPABASE_ANON_KEY müssen als Umgebungsvariablen gesetzt sein.")
     
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    async with _supabase_lock:
+        if _supabase is None:
+            import httpx
+            from supabase._async.client import create_client
+            from supabase.lib.client_options import AsyncClientOptions
+            
+            options = AsyncClientOptions(
+                httpx_client=httpx.AsyncClient(timeout=30, limits=httpx.Limits(**SUPABASE_HTTP_LIMITS))
+            )
+            _supabase = await create_client(SUPABASE_URL, SUPABASE_ANON_KEY, options=options)
+    return _supabase
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Liefert den gemeinsam genutzten HTTP-Client für den Llama-Server.
+    Verbindungen bleiben offen (Keep-Alive) und werden zwischen Anfragen
+    wiederverwendet.
+    
+    Returns:
+        HTTP-Client mit Verbindungspool
+    """
+    import httpx
+    
+    # limits gehört an den Transport: bei explizitem transport= ignoriert
+    # httpx.AsyncClient sein eigenes limits-Argument
+    return httpx.AsyncClient(
+        timeout=60,
+        transport=httpx.AsyncHTTPTransport(
+            retries=3,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """
+    Liefert den gemeinsam genutzten Redis-Client. Kurze Timeouts sorgen dafür,
+    dass ein nicht erreichbarer Redis-Server den Cache schnell übergehen lässt.
+    
+    Returns:
+        Redis-Client (verbindet sich erst beim ersten Befehl)
+    """
+    import redis.asyncio as redis
+    
+    return redis.from_url(REDIS_URL, socket_connect_timeout=REDIS_TIMEOUT, socket_timeout=REDIS_TIMEOUT)
+
+
+async def cache_get(key: str) -> bytes | None:
+    """
+    Liest einen Wert aus dem Redis-Cache. Ist Redis nicht erreichbar,
+    wird der Cache übergangen.
+    
+    Args:
+        key: Cache-Schlüssel
+        
+    Returns:
+        Gespeicherter Wert oder None
+    """
+    from redis import RedisError
     
     try:
-        # Annahme: Tabelle 'crypto_prices' mit Spalten: symbol, price, timestamp
-        response = supabase.table('crypto_prices').select('*').order('timestamp', desc=True).limit(50).execute()
+        return await get_redis().get(key)
+    except RedisError:
+        return None
+
+
+async def cache_set(key: str, ttl: int, value: str | bytes) -> None:
+    """
+    Schreibt einen Wert mit Ablaufzeit in den Redis-Cache.
+    
+    Args:
+        key: Cache-Schlüssel
+        ttl: Gültigkeit in Sekunden
+        value: Zu speichernder Wert
+    """
+    from redis import RedisError
+    
+    try:
+        await get_redis().set(key, value, ex=ttl)
+    except RedisError:
+        pass
+
+
+async def close_clients() -> None:
+    """
+    Schließt alle gemeinsam genutzten Verbindungen (Supabase, Llama, Redis).
+    """
+    if _supabase is not None:
+        if _supabase.get_channels():
+            await _supabase.remove_all_channels()
+        await _supabase.options.httpx_client.aclose()
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+    if get_redis.cache_info().currsize:
+        await get_redis().aclose()
+
+
+async def fetch_latest_prices() -> list:
+    """
+    Lädt den jüngsten Kurs je Symbol direkt aus Supabase, ohne Cache.
+    
+    Returns:
+        Liste von Krypto-Datensätzen (symbol, price, timestamp), ein Eintrag pro Symbol
+    """
+    from postgrest import APIError
+    
+    supabase = await get_supabase_client()
+    
+    try:
+        # Postgres-Funktion latest_prices() (siehe README) liefert nur den
+        # jüngsten Kurs je Symbol: symbol, price, timestamp
+        response = await supabase.rpc('latest_prices').execute()
         return response.data
+    except APIError as e:
+        # PGRST202: Funktion existiert nicht, alle anderen Fehler sind echte Fehler
+        if e.code != 'PGRST202':
+            print(f"Fehler beim Abrufen der Krypto-Daten: {e}")
+            return []
+        print("latest_prices() nicht vorhanden, lade Tabelle direkt.")
     except Exception as e:
         print(f"Fehler beim Abrufen der Krypto-Daten: {e}")
         return []
+    
+    try:
+        # Annahme: Tabelle 'crypto_prices' mit Spalten: symbol, price, timestamp
+        response = await (
+            supabase.table('crypto_prices')
+            .select('symbol,price,timestamp')
+            .order('timestamp', desc=True)
+            .limit(50)
+            .execute()
+        )
+    except Exception as e:
+        print(f"Fehler beim Abrufen der Krypto-Daten: {e}")
+        return []
+    
+    # Zeilen sind absteigend nach timestamp sortiert: die erste je Symbol ist die jüngste
+    latest = {}
+    for row in response.data:
+        latest.setdefault(row['symbol'], row)
+    return list(latest.values())
+
+
+async def get_crypto_data() -> list:
+    """
+    Ruft den aktuellen Kurs je Kryptowährung aus der Supabase-Datenbank ab.
+    
+    Returns:
+        Liste von Krypto-Datensätzen (ein Eintrag pro Symbol)
+    """
+    # Bei aktiver Realtime-Subscription liegen die Kurse bereits im Speicher;
+    # während einer Verbindungsunterbrechung wird wieder Supabase gefragt
+    if _realtime_channel is not None and _realtime_channel.is_joined:
+        return list(LATEST_PRICES.values())
+    
+    # Kurse ändern sich innerhalb weniger Sekunden kaum: kurz zwischengespeicherte
+    # Ergebnisse werden von allen Aufrufen (CLI, Cron, Dashboard) geteilt
+    cached = await cache_get(CRYPTO_CACHE_KEY)
+    if cached is not None:
+        return orjson.loads(cached)
+    
+    data = await fetch_latest_prices()
+    if data:
+        await cache_set(CRYPTO_CACHE_KEY, CRYPTO_CACHE_TTL, orjson.dumps(data, option=orjson.OPT_NAIVE_UTC))
+    return data
+
+
+def _parse_timestamp(value) -> datetime | None:
+    """
+    Wandelt einen ISO-Zeitstempel aus Supabase in ein vergleichbares datetime um.
+    
+    Args:
+        value: Zeitstempel als String (mit oder ohne Zeitzone)
+        
+    Returns:
+        datetime in UTC oder None, falls nicht lesbar
+    """
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _store_latest_price(record: dict) -> None:
+    """
+    Übernimmt einen Datensatz in LATEST_PRICES, sofern er nicht älter ist als
+    der gespeicherte Kurs desselben Symbols (z. B. nachträglich eingefügte
+    oder geänderte historische Zeilen).
+    
+    Args:
+        record: Zeile aus 'crypto_prices' mit symbol, price, timestamp
+    """
+    symbol = record['symbol']
+    current = LATEST_PRICES.get(symbol)
+    if current is not None:
+        new_ts = _parse_timestamp(record.get('timestamp'))
+        current_ts = _parse_timestamp(current.get('timestamp'))
+        if current_ts is not None and (new_ts is None or new_ts < current_ts):
+            return
+    LATEST_PRICES[symbol] = {
+        'symbol': symbol,
+        'price': record.get('price'),
+        'timestamp': record.get('timestamp'),
+    }
+
+
+def _run_in_background(coro) -> None:
+    """
+    Startet eine Coroutine als Hintergrund-Task und hält eine Referenz darauf.
+    
+    Args:
+        coro: Auszuführende Coroutine
+    """
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _reseed_latest_prices(channel: AsyncRealtimeChannel) -> None:
+    """
+    Lädt den aktuellen Stand nach einem (Wieder-)Beitritt zum Realtime-Kanal
+    neu, da Änderungen während einer Unterbrechung nicht zugestellt werden.
+    Erst danach beantwortet get_crypto_data wieder aus dem Speicher.
+    
+    Args:
+        channel: Abonnierter Realtime-Kanal
+    """
+    global _realtime_channel
+    
+    # Am Cache vorbei laden; neuere Realtime-Kurse bleiben dabei erhalten
+    data = await fetch_latest_prices()
+    for item in data:
+        _store_latest_price(item)
+    if data and channel.is_joined:
+        _realtime_channel = channel
+
+
+def _update_latest_price(payload: dict) -> None:
+    """
+    Übernimmt eine Änderung an 'crypto_prices' in LATEST_PRICES.
+    
+    Gelöschte Zeilen werden nur erkannt, wenn die Tabelle mit REPLICA IDENTITY
+    FULL alle alten Spalten mitsendet (siehe README); sonst werden sie ignoriert.
+    
+    Args:
+        payload: Postgres-Changes-Nachricht der Realtime-Subscription
+    """
+    data = payload['data']
+    record = data.get('record')
+    if record and 'symbol' in record:
+        _store_latest_price(record)
+        return
+    
+    # DELETE: war es der gespeicherte jüngste Kurs, den Nachfolger neu laden
+    old_record = data.get('old_record') or {}
+    current = LATEST_PRICES.get(old_record.get('symbol'))
+    if current is None:
+        return
+    if _parse_timestamp(old_record.get('timestamp')) == _parse_timestamp(current.get('timestamp')):
+        del LATEST_PRICES[old_record['symbol']]
+        if _realtime_channel is not None:
+            _run_in_background(_reseed_latest_prices(_realtime_channel))
+
+
+async def subscribe_crypto_prices() -> bool:
+    """
+    Abonniert Änderungen an 'crypto_prices' über Supabase Realtime und lädt
+    einmalig den aktuellen Stand. Danach beantwortet get_crypto_data alle
+    Abfragen aus dem Speicher, statt Supabase erneut abzufragen. Schlägt das
+    Abonnement fehl oder ist die Verbindung unterbrochen, fällt
+    get_crypto_data auf RPC und Cache zurück; nach jedem erneuten Beitritt
+    wird der Stand neu geladen.
+    
+    Returns:
+        True, wenn der Server das Abonnement bestätigt hat
+    """
+    from realtime import RealtimeSubscribeStates
+    
+    subscribed = asyncio.Event()
+    status = {}
+    
+    def on_status(state: RealtimeSubscribeStates, error: Exception | None) -> None:
+        global _realtime_channel
+        
+        # Jede Statusänderung entwertet den Speicherstand, bis neu geladen wurde
+        _realtime_channel = None
+        if subscribed.is_set():
+            # Automatischer Wiederbeitritt nach Fehler oder Verbindungsabbruch
+            if state == RealtimeSubscribeStates.SUBSCRIBED:
+                _run_in_background(_reseed_latest_prices(channel))
+            return
+        status['state'], status['error'] = state, error
+        subscribed.set()
+    
+    supabase = await get_supabase_client()
+    channel = supabase.channel('crypto')
+    channel.on_postgres_changes(
+        '*', schema='public', table='crypto_prices', callback=_update_latest_price
+    )
+    
+    async def join() -> None:
+        # subscribe() sendet nur die Anfrage; die Bestätigung kommt per on_status
+        await channel.subscribe(on_status)
+        await subscribed.wait()
+    
+    try:
+        await asyncio.wait_for(join(), REALTIME_SUBSCRIBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        status['state'], status['error'] = RealtimeSubscribeStates.TIMED_OUT, None
+    except Exception as e:
+        status['state'], status['error'] = RealtimeSubscribeStates.CHANNEL_ERROR, e
+    
+    if status.get('state') != RealtimeSubscribeStates.SUBSCRIBED:
+        print(f"Realtime-Abonnement fehlgeschlagen ({status['state'].value}: {status['error']}), "
+              "Kurse werden bei jeder Frage neu geladen.")
+        await supabase.remove_channel(channel)
+        return False
+    
+    # Erst nach bestätigtem Abonnement laden, damit keine Änderung verloren geht
+    await _reseed_latest_prices(channel)
+    return True
 
 
 def format_crypto_context(data: list) -> str:
@@ -52,63 +421,248 @@ def format_crypto_context(data: list) -> str:
     if not data:
         return "Keine Krypto-Daten verfügbar."
     
-    context = "Aktuelle Kryptokurse:\n\n"
-    for item in data:
-        symbol = item.get('symbol', 'N/A')
-        price = item.get('price', 'N/A')
-        timestamp = item.get('timestamp', 'N/A')
-        context += f"- {symbol}: ${price} (Stand: {timestamp})\n"
+    lines = [
+        f"- {item.get('symbol', 'N/A')}: ${item.get('price', 'N/A')} (Stand: {item.get('timestamp', 'N/A')})\n"
+        for item in data
+    ]
+    return "Aktuelle Kryptokurse:\n\n" + "".join(lines)
+
+
+async def warm_up_llama(llama_url: str) -> None:
+    """
+    Lädt das Modell auf dem Llama-Server vorab (leerer Prompt), damit die
+    eigentliche Anfrage nicht auf den Modellstart warten muss. Fehler werden
+    ignoriert; die Anfrage selbst meldet sie später.
+    
+    Args:
+        llama_url: URL des Llama-Servers
+    """
+    import httpx
+    
+    payload = {
+        "model": LLAMA_MODEL,
+        "prompt": "",
+        "keep_alive": "10m",
+        "stream": False
+    }
+    
+    try:
+        response = await get_http_client().post(llama_url, content=orjson.dumps(payload), headers=JSON_HEADERS)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        pass
+
+
+async def prime_llama_context(context: str, llama_url: str) -> list | None:
+    """
+    Lässt den Llama-Server den Kontext einmalig verarbeiten. Die zurückgegebenen
+    Kontext-Token können an Folgeanfragen übergeben werden, damit der Server
+    die Krypto-Daten nicht für jede Frage erneut einlesen muss.
+    
+    Args:
+        context: Zusätzlicher Kontext (Krypto-Daten)
+        llama_url: URL des Llama-Servers
+        
+    Returns:
+        Kontext-Token des Servers oder None, falls nicht verfügbar
+    """
+    import httpx
+    
+    payload = {
+        "model": LLAMA_MODEL,
+        "prompt": context,
+        "stream": False,
+        "options": {"num_predict": 1}
+    }
+    
+    try:
+        response = await get_http_client().post(llama_url, content=orjson.dumps(payload), headers=JSON_HEADERS)
+        response.raise_for_status()
+        return orjson.loads(response.content).get('context')
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def _llama_prompts(prompt: str, context: str) -> tuple[str, str]:
+    """
+    Baut den Fragen-Teil und den vollständigen Prompt für eine Benutzerfrage.
+    
+    Args:
+        prompt: Benutzerfrage
+        context: Zusätzlicher Kontext (Krypto-Daten)
+        
+    Returns:
+        (Fragen-Prompt, vollständiger Prompt mit Kontext)
+    """
+    question_prompt = f"Frage: {prompt}\n\nAntwort:"
+    return question_prompt, f"{context}\n\n{question_prompt}"
+
+
+def _llama_cache_key(full_prompt: str, primed: bool = False) -> str:
+    """
+    Cache-Schlüssel einer Llama-Antwort. Antworten auf einen vorverarbeiteten
+    Kontext (prime_llama_context) folgen auf ein bereits generiertes Token und
+    werden getrennt von Antworten auf den vollständigen Prompt gespeichert.
     
-    return context
+    Args:
+        full_prompt: Vollständiger Prompt mit Kontext
+        primed: True, wenn die Antwort mit Kontext-Token erzeugt wurde
+        
+    Returns:
+        Redis-Schlüssel
+    """
+    prefix = "llama:primed:" if primed else "llama:"
+    return prefix + hashlib.sha1(f"{LLAMA_MODEL}|{full_prompt}".encode()).hexdigest()
+
+
+async def cached_llama_answer(prompt: str, context: str, primed: bool = False) -> str | None:
+    """
+    Sucht eine zwischengespeicherte Antwort auf eine Frage.
+    
+    Args:
+        prompt: Benutzerfrage
+        context: Zusätzlicher Kontext (Krypto-Daten)
+        primed: Auch Antworten auf vorverarbeiteten Kontext akzeptieren
+        
+    Returns:
+        Gespeicherte Antwort oder None
+    """
+    _, full_prompt = _llama_prompts(prompt, context)
+    cached = await cache_get(_llama_cache_key(full_prompt))
+    if cached is None and primed:
+        cached = await cache_get(_llama_cache_key(full_prompt, primed=True))
+    return cached.decode() if cached is not None else None
 
 
-def query_llama(prompt: str, context: str, llama_url: str) -> str:
+async def aquery_llama(
+    prompt: str,
+    context: str,
+    llama_url: str,
+    on_token: Callable[[str], None] | None = None,
+    llama_context: list | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> str:
     """
-    Sendet eine Anfrage mit Kontext an den lokalen Llama-Server.
+    Sendet eine Anfrage mit Kontext an den lokalen Llama-Server. Die Antwort
+    wird gestreamt; jedes Teilstück wird sofort an on_token übergeben.
     
     Args:
         prompt: Benutzerfrage
         context: Zusätzlicher Kontext (Krypto-Daten)
         llama_url: URL des Llama-Servers
+        on_token: Optionaler Callback für jedes empfangene Textstück
+        llama_context: Kontext-Token aus prime_llama_context; ersetzen den
+            Kontext-Text im Prompt
+        semaphore: Optionale Begrenzung gleichzeitiger Anfragen
         
     Returns:
-        Antwort des LLM
+        Vollständige Antwort des LLM
     """
-    full_prompt = f"{context}\n\nFrage: {prompt}\n\nAntwort:"
+    def emit(text: str) -> str:
+        if on_token is not None:
+            on_token(text)
+        return text
+    
+    question_prompt, full_prompt = _llama_prompts(prompt, context)
+    
+    # Gleiche Frage mit gleichem Kontext direkt aus dem Cache beantworten
+    cached = await cached_llama_answer(prompt, context, primed=bool(llama_context))
+    if cached is not None:
+        return emit(cached)
     
     payload = {
         "model": LLAMA_MODEL,
         "prompt": full_prompt,
-        "stream": False
+        "stream": True
     }
+    if llama_context:
+        payload["prompt"] = question_prompt
+        payload["context"] = llama_context
     
+    import httpx
+    
+    parts = []
     try:
-        response = requests.post(llama_url, json=payload, timeout=60)
-        response.raise_for_status()
-        result = response.json()
-        return result.get('response', 'Keine Antwort erhalten.')
-    except requests.exceptions.RequestException as e:
-        return f"Fehler bei der Kommunikation mit dem Llama-Server: {e}"
+        async with semaphore or contextlib.nullcontext():
+            async with get_http_client().stream(
+                "POST", llama_url, content=orjson.dumps(payload), headers=JSON_HEADERS
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    # Ollama meldet Fehler während des Streams mit HTTP 200
+                    if chunk.get('error'):
+                        return emit(f"Fehler bei der Kommunikation mit dem Llama-Server: {chunk['error']}")
+                    token = chunk.get('response')
+                    if token:
+                        parts.append(emit(token))
+                    if chunk.get('done'):
+                        break
+    except (httpx.HTTPError, ValueError) as e:
+        # ValueError: Antwort ist kein NDJSON (z. B. SSE eines anderen Servers)
+        return emit(f"Fehler bei der Kommunikation mit dem Llama-Server: {e}")
+    
+    answer = "".join(parts)
+    if not answer:
+        return emit('Keine Antwort erhalten.')
+    
+    await cache_set(_llama_cache_key(full_prompt, primed=bool(llama_context)), LLAMA_CACHE_TTL, answer)
+    return answer
 
 
-def main():
+def parse_args(argv: list) -> argparse.Namespace | SimpleNamespace:
     """
-    Hauptfunktion: Ruft Krypto-Daten ab und beantwortet Benutzerfrage.
+    Liest die Kommandozeilenargumente. Der häufigste Aufruf mit genau einer
+    Frage (-q "...") wird ohne argparse verarbeitet.
+    
+    Args:
+        argv: Argumente ohne Programmnamen
+        
+    Returns:
+        Namespace mit question (Liste), interactive, llama_url und concurrency
     """
+    if len(argv) == 2 and argv[0] in ('-q', '--question') and not argv[1].startswith('-'):
+        return SimpleNamespace(
+            question=[argv[1]], interactive=False, llama_url=LLAMA_API_URL, concurrency=LLAMA_CONCURRENCY
+        )
+    
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Kryptokurse von Supabase abrufen und via Llama LLM abfragen',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""Beispiel:
   python llama_crypto_query.py --question "Welche Kryptowährung hat den höchsten Preis?"
   python llama_crypto_query.py -q "Was ist der Bitcoin-Preis?" --llama-url http://localhost:11434/api/generate
+  python llama_crypto_query.py -q "Was kostet BTC?" "Was kostet ETH?"
+  python llama_crypto_query.py --interactive
+
+Mehrere Fragen werden gleichzeitig an den Llama-Server gesendet, höchstens
+--concurrency auf einmal. Damit Ollama sie auch parallel verarbeitet, muss der
+Server mit OLLAMA_NUM_PARALLEL > 1 gestartet werden (z. B.
+OLLAMA_NUM_PARALLEL=4 ollama serve); derselbe Wert ist der Standard für
+--concurrency.
+
+Mit --interactive bleibt das Skript aktiv, hält die Kurse per Supabase
+Realtime aktuell und beantwortet Fragen von der Standardeingabe.
         """
     )
     
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group(required=True)
+    
+    mode.add_argument(
         '-q', '--question',
         type=str,
-        required=True,
-        help='Die Frage an den Llama LLM über Kryptokurse'
+        nargs='+',
+        help='Eine oder mehrere Fragen an den Llama LLM über Kryptokurse'
+    )
+    
+    mode.add_argument(
+        '-i', '--interactive',
+        action='store_true',
+        help='Fragen fortlaufend von der Standardeingabe lesen (Kurse via Realtime)'
     )
     
     parser.add_argument(
@@ -118,30 +672,159 @@ def main():
         help=f'URL des Llama-API-Servers (Standard: {LLAMA_API_URL})'
     )
     
-    args = parser.parse_args()
-    
-    print("Rufe Krypto-Daten von Supabase ab...")
-    crypto_data = get_crypto_data()
-    
-    if not crypto_data:
-        print("Keine Daten verfügbar. Beende.")
-        return 1
-    
-    print(f"Gefunden: {len(crypto_data)} Krypto-Datensätze")
-    
-    context = format_crypto_context(crypto_data)
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=LLAMA_CONCURRENCY,
+        help=f'Maximale Anzahl gleichzeitiger Llama-Anfragen (Standard: {LLAMA_CONCURRENCY})'
+    )
     
-    print(f"\nSende Anfrage an Llama-Server ({args.llama_url})...")
-    print(f"Frage: {args.question}\n")
+    return parser.parse_args(argv)
+
+
+async def answer_interactively(llama_url: str) -> int:
+    """
+    Dauerbetrieb: Hält die Kurse per Realtime-Subscription aktuell und
+    beantwortet Fragen von der Standardeingabe bis zu einer leeren Zeile.
     
-    answer = query_llama(args.question, context, args.llama_url)
+    Args:
+        llama_url: URL des Llama-Servers
+        
+    Returns:
+        Exit-Code
+    """
+    # Modell im Hintergrund laden; gewartet wird erst vor der ersten Llama-Anfrage
+    warm_up = asyncio.create_task(warm_up_llama(llama_url))
+    try:
+        print("Abonniere Krypto-Daten von Supabase...")
+        await subscribe_crypto_prices()
+        crypto_data = await get_crypto_data()
+        
+        if not crypto_data:
+            print("Keine Daten verfügbar. Beende.")
+            return 1
+        
+        print(f"Gefunden: {len(crypto_data)} Kryptowährungen. Leere Eingabe beendet.")
+        
+        while True:
+            try:
+                # input() blockiert, daher im Thread: Realtime-Updates laufen weiter
+                question = await asyncio.to_thread(input, "\nFrage: ")
+            except EOFError:
+                break
+            if not question.strip():
+                break
+            
+            context = format_crypto_context(await get_crypto_data())
+            print("\nAntwort:")
+            cached = await cached_llama_answer(question, context)
+            if cached is not None:
+                print(cached)
+                continue
+            
+            await warm_up
+            await aquery_llama(
+                question, context, llama_url,
+                on_token=lambda token: print(token, end="", flush=True)
+            )
+            print()
+        
+        return 0
+    finally:
+        warm_up.cancel()
+
+
+async def answer_questions(args: argparse.Namespace | SimpleNamespace) -> int:
+    """
+    Beantwortet die per -q übergebenen Fragen.
     
-    print("Antwort:")
-    print(answer)
+    Args:
+        args: Kommandozeilenargumente (question, llama_url, concurrency)
+        
+    Returns:
+        Exit-Code
+    """
+    # Modell laden, während die Daten von Supabase unterwegs sind. Gewartet
+    # wird erst vor der ersten Llama-Anfrage; kommen alle Antworten aus dem
+    # Cache, wird das Vorladen abgebrochen.
+    warm_up = asyncio.create_task(warm_up_llama(args.llama_url))
+    try:
+        print("Rufe Krypto-Daten von Supabase ab...")
+        crypto_data = await get_crypto_data()
+        
+        if not crypto_data:
+            print("Keine Daten verfügbar. Beende.")
+            return 1
+        
+        print(f"Gefunden: {len(crypto_data)} Krypto-Datensätze")
+        
+        context = format_crypto_context(crypto_data)
+        
+        print(f"\nSende {len(args.question)} Anfrage(n) an Llama-Server ({args.llama_url})...")
+        
+        if len(args.question) == 1:
+            # Einzelne Frage: Antwort schon während der Generierung ausgeben
+            print(f"\nFrage: {args.question[0]}\n")
+            print("Antwort:")
+            cached = await cached_llama_answer(args.question[0], context)
+            if cached is not None:
+                print(cached)
+                return 0
+            
+            await warm_up
+            await aquery_llama(
+                args.question[0], context, args.llama_url,
+                on_token=lambda token: print(token, end="", flush=True)
+            )
+            print()
+        else:
+            # Mehrere Fragen: zwischengespeicherte Antworten übernehmen, für die
+            # übrigen den Kontext einmal vorverarbeiten und parallel abfragen
+            cached = await asyncio.gather(
+                *(cached_llama_answer(question, context, primed=True) for question in args.question)
+            )
+            missing = [question for question, answer in zip(args.question, cached) if answer is None]
+            
+            llama_context = None
+            if missing:
+                await warm_up
+            if len(missing) > 1:
+                llama_context = await prime_llama_context(context, args.llama_url)
+            semaphore = asyncio.Semaphore(max(1, args.concurrency))
+            fresh = iter(await asyncio.gather(
+                *(
+                    aquery_llama(
+                        question, context, args.llama_url,
+                        llama_context=llama_context, semaphore=semaphore
+                    )
+                    for question in missing
+                )
+            ))
+            answers = [answer if answer is not None else next(fresh) for answer in cached]
+            
+            for question, answer in zip(args.question, answers):
+                print(f"\nFrage: {question}\n")
+                print("Antwort:")
+                print(answer)
+        
+        return 0
+    finally:
+        warm_up.cancel()
+
+
+async def main():
+    """
+    Hauptfunktion: Ruft Krypto-Daten ab und beantwortet Benutzerfragen.
+    """
+    args = parse_args(sys.argv[1:])
     
-    return 0
+    try:
+        if args.interactive:
+            return await answer_interactively(args.llama_url)
+        return await answer_questions(args)
+    finally:
+        await close_clients()
 
 
 if __name__ == "__main__":
-    import sys
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))